@@ -2,6 +2,8 @@
 # This file contains example Standard Operating Procedures (SOPs) for lab experiments.
 # These are realistic protocols that the AI will compare against lab images.
 
+import textwrap
+
 SAMPLE_SOPS = {
     "Cell Viability Assay (MTT Protocol)": """
 STANDARD OPERATING PROCEDURE: MTT Cell Viability Assay
@@ -131,3 +133,8 @@ REJECTION CRITERIA:
 - Inconsistent colony counts between replicates (CV >25%)
 """
 }
+
+# Normalize once at import: dedent and trim the triple-quoted literals so the
+# prompts (and their digests) never carry incidental leading/trailing
+# whitespace from the source formatting above.
+SAMPLE_SOPS = {k: textwrap.dedent(v).strip() for k, v in SAMPLE_SOPS.items()}